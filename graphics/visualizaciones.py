@@ -1,41 +1,90 @@
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import pickle
+import sys
+
 import numpy as np
 
+# Máximo de puntos enviados al navegador por traza; el resto se re-muestrea al hacer zoom
+MAX_N_SAMPLES = 2000
+
 def plot_simulation_results_plotly(results):
-    """Genera visualizaciones interactivas de los resultados de la simulación con Plotly."""
-    times = np.array(results['times'])
-    fidelities = np.array(results['fidelities'])
-    logical_error_prob = np.array(results['logical_error_prob'])
+    """
+    Genera visualizaciones interactivas de los resultados de la simulación con Plotly.
+    
+    Solo construye y retorna la figura; para verla con re-muestreo al hacer zoom,
+    llamar a fig.show_dash() (ver _cli).
+    """
+    # Importaciones diferidas: plotly solo se carga cuando realmente se grafica
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    from plotly.subplots import make_subplots
+    from plotly_resampler import FigureResampler
+    from plotly_resampler.aggregation import MinMaxLTTB
+    
+    # orjson serializa los arreglos de NumPy mucho más rápido que json de la stdlib
+    pio.json.config.default_engine = 'orjson'
+    
+    # float32 basta para los valores graficados y reduce a la mitad los bytes
+    # serializados; el eje x sigue en float64 para no fusionar instantes cercanos
+    # (el re-muestreo necesita un x estrictamente monótono en corridas largas)
+    times = np.asarray(results['times'], dtype=np.float64)
+    fidelities = np.asarray(results['fidelities'], dtype=np.float32)
+    logical_error_prob = np.asarray(results['logical_error_prob'], dtype=np.float32)
     correction_events = results['correction_events']
     
-    # Crear subgráficos: dos filas, una para fidelidad y otra para error lógico
-    fig = make_subplots(rows=2, cols=1,
-                        subplot_titles=("Evolución de la Fidelidad con Corrección de Errores",
-                                      "Probabilidad de Error Lógico en el Tiempo"),
-                        shared_xaxes=True,
-                        vertical_spacing=0.1)
+    # Crear subgráficos: dos filas, una para fidelidad y otra para error lógico.
+    # FigureResampler solo envía al navegador la porción visible ya reducida.
+    fig = FigureResampler(
+        make_subplots(rows=2, cols=1,
+                      subplot_titles=("Evolución de la Fidelidad con Corrección de Errores",
+                                    "Probabilidad de Error Lógico en el Tiempo"),
+                      shared_xaxes=True,
+                      vertical_spacing=0.1),
+        default_n_shown_samples=MAX_N_SAMPLES,
+        default_downsampler=MinMaxLTTB()
+    )
     
     # Gráfico 1: Fidelidad
     fig.add_trace(
-        go.Scatter(x=times, y=fidelities, mode='lines', name='Fidelidad',
-                  line=dict(color='blue')),
+        go.Scattergl(mode='lines', name='Fidelidad', line=dict(color='blue'),
+                     hoverinfo='skip'),
+        hf_x=times, hf_y=fidelities, max_n_samples=MAX_N_SAMPLES,
         row=1, col=1
     )
     
-    # Agregar líneas verticales para eventos de corrección
-    correction_times = [event['time'] for event in correction_events]
-    correction_success = [event['success'] for event in correction_events]
-    for t, success in zip(correction_times, correction_success):
-        color = 'green' if success else 'red'
-        fig.add_vline(x=t, line_dash="dash", line_color=color,
-                     annotation_text="Corrección" if success else "Fallo",
-                     annotation_position="top", row=1, col=1)
+    # Agregar líneas verticales para eventos de corrección: una sola traza por
+    # resultado, construida con máscaras de NumPy en lugar de una forma por evento
+    if isinstance(correction_events, dict):
+        # Formato de arreglos paralelos: {'time': ndarray, 'success': ndarray}
+        correction_times = np.asarray(correction_events['time'], dtype=np.float64)
+        correction_success = np.asarray(correction_events['success'], dtype=bool)
+    else:
+        # Formato antiguo: lista de dicts {'time': t, 'success': ok}
+        correction_times = np.fromiter((event['time'] for event in correction_events),
+                                       dtype=np.float64, count=len(correction_events))
+        correction_success = np.fromiter((event['success'] for event in correction_events),
+                                         dtype=bool, count=len(correction_events))
+    # La fidelidad está acotada en [0, 1]: las líneas cubren todo ese rango
+    y_min, y_max = 0.0, 1.0
+    for mask, label, color in ((correction_success, 'Corrección', 'green'),
+                               (~correction_success, 'Fallo', 'red')):
+        n_events = int(mask.sum())
+        if n_events == 0:
+            continue
+        # Segmentos (t, y_min) -> (t, y_max) separados por NaN
+        xs = np.repeat(correction_times[mask], 3)
+        ys = np.tile([y_min, y_max, np.nan], n_events)
+        fig.add_trace(
+            go.Scattergl(x=xs, y=ys, mode='lines', name=label,
+                         line=dict(color=color, dash='dash')),
+            max_n_samples=xs.size,
+            row=1, col=1
+        )
     
     # Gráfico 2: Probabilidad de error lógico
     fig.add_trace(
-        go.Scatter(x=times, y=logical_error_prob, mode='lines', name='Prob. Error Lógico',
-                  line=dict(color='red')),
+        go.Scattergl(mode='lines', name='Prob. Error Lógico', line=dict(color='red'),
+                     hoverinfo='skip'),
+        hf_x=times, hf_y=logical_error_prob, max_n_samples=MAX_N_SAMPLES,
         row=2, col=1
     )
     
@@ -44,16 +93,26 @@ def plot_simulation_results_plotly(results):
     fig.update_yaxes(title_text="Fidelidad", row=1, col=1)
     fig.update_yaxes(title_text="Prob. Error Lógico", row=2, col=1)
     
-    # Actualizar diseño general
+    # Actualizar diseño general (sin hover: evita recorrer todos los puntos al mover el ratón)
     fig.update_layout(
         title_text="Simulación de Corrección de Errores Cuánticos",
         showlegend=True,
+        hovermode=False,
         height=800,
         width=1000
     )
     
-    # Mostrar gráfico interactivo
-    fig.show()
+    return fig
+
+def _cli():
+    """Grafica los resultados guardados con pickle: python visualizaciones.py resultados.pkl"""
+    if len(sys.argv) != 2:
+        sys.exit(f"Uso: {sys.argv[0]} <resultados.pkl>")
+    with open(sys.argv[1], 'rb') as f:
+        results = pickle.load(f)
+    fig = plot_simulation_results_plotly(results)
+    # Mostrar gráfico interactivo (servidor Dash que re-muestrea al hacer zoom)
+    fig.show_dash()
 
-# Llamar a la función con los resultados de la simulación
-plot_simulation_results_plotly(results)
\ No newline at end of file
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,107 @@
+"""
+Ciclo QEC del código de 3 qubits compilado con Catalyst (PennyLane + QJIT).
+
+Codificación -> error -> síndrome -> corrección -> medición se compilan en un
+único programa nativo: la primera llamada paga la compilación y las siguientes
+ejecutan el ciclo sin reconstruir el circuito en Python ni volver al intérprete
+entre la medición del síndrome y la corrección.
+"""
+
+import numpy as np
+import pennylane as qml
+from functools import lru_cache
+from typing import Dict
+
+# Cables: 0 lógico, 1-3 datos, 4-5 ancillas
+DATA_WIRES = [1, 2, 3]
+ANCILLA_WIRES = [4, 5]
+
+# Estados iniciales como enteros (argumentos trazables por QJIT)
+INITIAL_STATES = {'zero': 0, 'one': 1, 'plus': 2}
+
+# Peso de cada bit de datos: qubit 0 = bit menos significativo, como en Qiskit
+_DATA_WEIGHTS = 1 << np.arange(len(DATA_WIRES))
+
+# Voto mayoritario de los 3 bits de datos (como entero) -> bit lógico; misma
+# tabla que qec_complete_system.LOGICAL, sin importar Qiskit
+LOGICAL = np.array([0, 0, 0, 1, 0, 1, 1, 1], dtype=np.uint8)
+
+@lru_cache(maxsize=None)
+def build_qec_cycle(shots: int):
+    """Compila (una vez por número de shots) el ciclo QEC completo con QJIT"""
+    device = qml.device("lightning.qubit", wires=6)
+
+    # mcm_method="one-shot": cada shot sigue su propia rama de medición a mitad de
+    # circuito, y todos los shots corren dentro del programa compilado
+    @qml.qjit
+    @qml.qnode(device, shots=shots, mcm_method="one-shot")
+    def qec_cycle(initial_state: int, error_qubit: int):
+        """Ejecuta el ciclo QEC; error_qubit = -1 para no inyectar error"""
+        # 1. Preparar estado inicial
+        qml.cond(initial_state == 1, qml.PauliX)(wires=0)
+        qml.cond(initial_state == 2, qml.Hadamard)(wires=0)
+
+        # 2. Codificación |ψ⟩ -> α|000⟩ + β|111⟩
+        qml.CNOT(wires=[0, DATA_WIRES[0]])
+        qml.CNOT(wires=[DATA_WIRES[0], DATA_WIRES[1]])
+        qml.CNOT(wires=[DATA_WIRES[0], DATA_WIRES[2]])
+
+        # 3. Error de bit-flip opcional
+        for qubit, wire in enumerate(DATA_WIRES):
+            qml.cond(error_qubit == qubit, qml.PauliX)(wires=wire)
+
+        # 4. Medición de síndrome Z₀Z₁ y Z₁Z₂
+        qml.CNOT(wires=[DATA_WIRES[0], ANCILLA_WIRES[0]])
+        qml.CNOT(wires=[DATA_WIRES[1], ANCILLA_WIRES[0]])
+        qml.CNOT(wires=[DATA_WIRES[1], ANCILLA_WIRES[1]])
+        qml.CNOT(wires=[DATA_WIRES[2], ANCILLA_WIRES[1]])
+        s0 = qml.measure(ANCILLA_WIRES[0])
+        s1 = qml.measure(ANCILLA_WIRES[1])
+
+        # 5. Corrección dentro del programa compilado (s0 es el bit menos significativo)
+        qml.cond(s0 & ~s1, qml.PauliX)(wires=DATA_WIRES[0])  # síndrome = '01'
+        qml.cond(s0 & s1, qml.PauliX)(wires=DATA_WIRES[1])   # síndrome = '11'
+        qml.cond(~s0 & s1, qml.PauliX)(wires=DATA_WIRES[2])  # síndrome = '10'
+
+        return qml.sample(wires=DATA_WIRES)
+
+    return qec_cycle
+
+def run_cycles(initial_state: str = 'plus', error_qubit: int = None,
+               shots: int = 1000) -> np.ndarray:
+    """Ejecuta todos los shots en una sola llamada y retorna los bits de datos como enteros"""
+    qec_cycle = build_qec_cycle(shots)
+    error = -1 if error_qubit is None else error_qubit
+    samples = np.asarray(qec_cycle(INITIAL_STATES[initial_state], error))
+    return (samples.reshape(shots, -1) @ _DATA_WEIGHTS).astype(np.uint8)
+
+def to_counts(data: np.ndarray) -> Dict[str, int]:
+    """Conteos con las mismas claves que Qiskit (qubit de datos 0 a la derecha)"""
+    n_data = len(DATA_WIRES)
+    histogram = np.bincount(data, minlength=2 ** n_data)
+    return {format(value, f'0{n_data}b'): int(count)
+            for value, count in enumerate(histogram) if count}
+
+def calculate_logical_error_rate(data: np.ndarray, expected_logical_state: str) -> float:
+    """Tasa de error lógico por voto mayoritario (tabla LOGICAL) de los bits de datos"""
+    if data.size == 0:
+        return 0
+    return float(np.mean(LOGICAL[data] != int(expected_logical_state)))
+
+def benchmark_performance(shots: int = 1000) -> Dict:
+    """Benchmark equivalente a QECSimulator.benchmark_performance sobre el ciclo compilado"""
+    results = {}
+    scenarios = [('no_error', None)] + [(f'error_qubit_{i}', i) for i in range(3)]
+    for scenario, error_qubit in scenarios:
+        # Desde |0⟩ el estado lógico esperado ('0') es determinista
+        data = run_cycles('zero', error_qubit, shots)
+        results[scenario] = {
+            'counts': to_counts(data),
+            'error_rate': calculate_logical_error_rate(data, '0')
+        }
+    return results
+
+if __name__ == "__main__":
+    print("=== Ciclo QEC compilado con Catalyst ===\n")
+    for scenario, data in benchmark_performance(shots=1000).items():
+        print(f"Escenario: {scenario} - Tasa de error lógico: {data['error_rate']:.3f}")
@@ -1,9 +1,36 @@
+import os
+from functools import cached_property, lru_cache
 from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister, transpile
-from qiskit.providers.aer import AerSimulator
-from qiskit.visualization import plot_histogram
+from qiskit.result import Result
 import numpy as np
-import matplotlib.pyplot as plt
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+# Voto mayoritario de los 3 bits de datos (como entero, qubit 0 = bit menos significativo)
+LOGICAL = (0, 0, 0, 1, 0, 1, 1, 1)
+
+# Síndrome del código de 3 qubits (como entero) -> qubit a corregir (-1 = sin error)
+_LUT = (-1, 0, 2, 1)
+
+def _decode_batch_loop(syndromes: np.ndarray) -> np.ndarray:
+    """Bucle de decodificación por lotes (explícito: es la forma que Numba compila mejor)"""
+    out = np.empty(syndromes.shape, dtype=np.int8)
+    for i in range(syndromes.size):
+        out[i] = _LUT[syndromes[i]]
+    return out
+
+@lru_cache(maxsize=None)
+def _get_batch_decoder():
+    """Compila el decodificador con Numba en el primer uso; sin Numba, Python puro"""
+    # Importación diferida: Numba encarece notablemente el import del módulo
+    try:
+        from numba import njit
+    except ImportError:
+        return _decode_batch_loop
+    return njit(_decode_batch_loop)
+
+def decode_batch(syndromes: np.ndarray) -> np.ndarray:
+    """Decodifica un lote 1D de síndromes enteros en índices de qubit a corregir"""
+    return _get_batch_decoder()(syndromes)
 
 class QuantumErrorCorrectionCode:
     """Clase base para códigos de corrección cuántica de errores"""
@@ -21,8 +48,8 @@ class QuantumErrorCorrectionCode:
         """Retorna los estabilizadores del código"""
         raise NotImplementedError
         
-    def decode_syndrome(self, syndrome: str) -> int:
-        """Decodifica el síndrome para determinar qué qubit corregir"""
+    def decode_syndrome(self, syndrome: int) -> int:
+        """Decodifica el síndrome (máscara de bits) para determinar qué qubit corregir"""
         raise NotImplementedError
 
 class ThreeQubitCode(QuantumErrorCorrectionCode):
@@ -30,6 +57,16 @@ class ThreeQubitCode(QuantumErrorCorrectionCode):
     
     def __init__(self):
         super().__init__("3-Qubit Code", 3, 1)
+        self._encoding_gate = self._build_encoding_gate()
+        
+    @staticmethod
+    def _build_encoding_gate():
+        """CNOT en cascada como una sola instrucción reutilizable (lógico + 3 datos)"""
+        encoder = QuantumCircuit(4, name='enc3')
+        encoder.cx(0, 1)
+        encoder.cx(1, 2)
+        encoder.cx(1, 3)
+        return encoder.to_gate()
         
     def encode_state(self, circuit: QuantumCircuit, logical_qubits: List[int], data_qubits: List[int]):
         """Codifica |0⟩ -> |000⟩, |1⟩ -> |111⟩, |+⟩ -> (|000⟩+|111⟩)/√2"""
@@ -37,36 +74,60 @@ class ThreeQubitCode(QuantumErrorCorrectionCode):
             raise ValueError("3-Qubit code requires 1 logical and 3 data qubits")
             
         # CNOT en cascada para crear la codificación
-        circuit.cx(logical_qubits[0], data_qubits[0])
-        circuit.cx(data_qubits[0], data_qubits[1])
-        circuit.cx(data_qubits[0], data_qubits[2])
+        circuit.append(self._encoding_gate, [logical_qubits[0]] + list(data_qubits))
         
     def get_stabilizers(self) -> List[str]:
         """Estabilizadores Z₀Z₁ y Z₁Z₂"""
         return ['ZZI', 'IZZ']
         
-    def decode_syndrome(self, syndrome: str) -> int:
+    def decode_syndrome(self, syndrome: int) -> int:
         """
-        Decodifica el síndrome de 2 bits:
-        00 -> Sin error
-        01 -> Error en qubit 0
-        11 -> Error en qubit 1  
-        10 -> Error en qubit 2
+        Decodifica el síndrome de 2 bits (bit 0 = Z₀Z₁, bit 1 = Z₁Z₂):
+        0b00 -> Sin error
+        0b01 -> Error en qubit 0
+        0b11 -> Error en qubit 1  
+        0b10 -> Error en qubit 2
+        Cualquier otro valor (fuera de 0-3) retorna -1, sin corrección.
         """
-        syndrome_map = {
-            '00': -1,  # Sin error
-            '01': 0,   # Error en qubit 0
-            '11': 1,   # Error en qubit 1
-            '10': 2    # Error en qubit 2
-        }
-        return syndrome_map.get(syndrome, -1)
+        if not 0 <= syndrome < len(_LUT):
+            return -1
+        return _LUT[syndrome]
+        
+    def decode_batch(self, syndromes: np.ndarray) -> np.ndarray:
+        """
+        Decodifica un arreglo 1D de síndromes enteros en un solo paso compilado.
+        
+        No valida el rango: los valores deben estar en 0-3 (ver decode_syndrome).
+        """
+        return decode_batch(np.asarray(syndromes, dtype=np.int64).ravel())
 
 class QECSimulator:
     """Simulador para experimentos de corrección cuántica de errores"""
     
     def __init__(self, code: QuantumErrorCorrectionCode):
         self.code = code
-        self.simulator = AerSimulator()
+        # Circuitos ya transpilados, indexados por (estado inicial, qubit con error, dinámico)
+        self._compiled_circuits: Dict[Tuple[str, Optional[int], bool], QuantumCircuit] = {}
+        self._syndrome_gate = self._build_syndrome_gate()
+        # Tablas resultado -> estado lógico, con y sin corrección diferida: como arreglo
+        # indexado por (data << n_syndrome) | syndrome y como dict de claves de get_counts
+        self._outcome_luts = {
+            True: self._build_outcome_lut(apply_correction=True),
+            False: self._build_outcome_lut(apply_correction=False)
+        }
+        self._outcome_tables = {
+            True: self._build_outcome_table(apply_correction=True),
+            False: self._build_outcome_table(apply_correction=False)
+        }
+        
+    @cached_property
+    def simulator(self):
+        """AerSimulator creado al primer uso (importar Aer dispara el descubrimiento del backend C++)"""
+        from qiskit_aer import AerSimulator
+        # El código de 3 qubits es Clifford: el simulador de estabilizadores basta
+        return AerSimulator(method='stabilizer',
+                            max_parallel_threads=os.cpu_count(),
+                            max_parallel_shots=os.cpu_count())
         
     def create_encoding_circuit(self, initial_state: str = 'plus') -> QuantumCircuit:
         """Crea el circuito de codificación"""
@@ -82,11 +143,22 @@ class QECSimulator:
             circuit.x(q_logical[0])  # |1⟩
         # Para '0' no hacemos nada (estado por defecto)
         
-        # Codificar
-        self.code.encode_state(circuit, [0], list(range(self.code.n_data)))
+        # Codificar (el qubit 0 es el lógico; los de datos empiezan en 1)
+        self.code.encode_state(circuit, [0], list(range(1, self.code.n_data + 1)))
         
         return circuit
         
+    def _build_syndrome_gate(self):
+        """Extracción de síndrome (4 CNOT) como una sola instrucción: 3 datos + 2 ancillas"""
+        extractor = QuantumCircuit(self.code.n_data + 2, name='syn3')
+        # Estabilizador 1: Z₀Z₁
+        extractor.cx(0, 3)
+        extractor.cx(1, 3)
+        # Estabilizador 2: Z₁Z₂
+        extractor.cx(1, 4)
+        extractor.cx(2, 4)
+        return extractor.to_gate()
+        
     def create_syndrome_measurement_circuit(self, data_qubits: List[int]) -> QuantumCircuit:
         """Crea el circuito para medir síndromes"""
         n_stabilizers = len(self.code.get_stabilizers())
@@ -97,13 +169,7 @@ class QECSimulator:
         circuit = QuantumCircuit(q_data, q_ancilla, c_syndrome)
         
         # Para el código de 3 qubits: medir Z₀Z₁ y Z₁Z₂
-        # Estabilizador 1: Z₀Z₁
-        circuit.cx(q_data[0], q_ancilla[0])
-        circuit.cx(q_data[1], q_ancilla[0])
-        
-        # Estabilizador 2: Z₁Z₂  
-        circuit.cx(q_data[1], q_ancilla[1])
-        circuit.cx(q_data[2], q_ancilla[1])
+        circuit.append(self._syndrome_gate, list(q_data) + list(q_ancilla))
         
         # Medir ancillas
         circuit.measure(q_ancilla, c_syndrome)
@@ -112,8 +178,16 @@ class QECSimulator:
         
     def create_full_qec_circuit(self, initial_state: str = 'plus', 
                                error_prob: float = 0.0, 
-                               error_qubit: int = None) -> QuantumCircuit:
-        """Crea el circuito completo de QEC con corrección dinámica"""
+                               error_qubit: int = None,
+                               dynamic: bool = False) -> QuantumCircuit:
+        """
+        Crea el circuito completo de QEC.
+        
+        Con dynamic=True la corrección se aplica dentro del circuito con control
+        clásico (necesario en hardware real). Por defecto el circuito es estático
+        y la corrección se difiere al post-proceso clásico de
+        calculate_logical_error_rate (principio de medición diferida).
+        """
         # Registros cuánticos y clásicos
         q_logical = QuantumRegister(1, 'logical')
         q_data = QuantumRegister(self.code.n_data, 'data')
@@ -121,7 +195,9 @@ class QECSimulator:
         c_syndrome = ClassicalRegister(2, 'syndrome')
         c_final = ClassicalRegister(self.code.n_data, 'final')
         
-        circuit = QuantumCircuit(q_logical, q_data, q_ancilla, c_syndrome, c_final)
+        # metadata['dynamic'] indica si los conteos ya vienen corregidos
+        circuit = QuantumCircuit(q_logical, q_data, q_ancilla, c_syndrome, c_final,
+                                 metadata={'dynamic': dynamic})
         
         # 1. Codificación
         if initial_state == 'plus':
@@ -129,89 +205,191 @@ class QECSimulator:
         elif initial_state == 'one':
             circuit.x(q_logical[0])
             
-        self.code.encode_state(circuit, [0], [0, 1, 2])
+        self.code.encode_state(circuit, [0], list(range(1, self.code.n_data + 1)))
         circuit.barrier()
         
         # 2. Simular error (opcional)
+        if error_prob > 0:
+            from qiskit_aer.noise import pauli_error
+            # Bit flip independiente con probabilidad error_prob en cada qubit de datos
+            bit_flip = pauli_error([('X', error_prob), ('I', 1 - error_prob)]).to_instruction()
+            for qubit in q_data:
+                circuit.append(bit_flip, [qubit])
+            circuit.barrier()
+            
         if error_qubit is not None and 0 <= error_qubit < self.code.n_data:
             circuit.x(q_data[error_qubit])  # Bit flip error
             circuit.barrier()
             
         # 3. Medición de síndrome
-        circuit.cx(q_data[0], q_ancilla[0])
-        circuit.cx(q_data[1], q_ancilla[0])
-        circuit.cx(q_data[1], q_ancilla[1])
-        circuit.cx(q_data[2], q_ancilla[1])
+        circuit.append(self._syndrome_gate, list(q_data) + list(q_ancilla))
         circuit.measure(q_ancilla, c_syndrome)
         circuit.barrier()
         
-        # 4. Corrección condicional (control dinámico)
-        with circuit.if_test((c_syndrome, 1)):  # síndrome = '01'
-            circuit.x(q_data[0])
-        with circuit.if_test((c_syndrome, 3)):  # síndrome = '11' 
-            circuit.x(q_data[1])
-        with circuit.if_test((c_syndrome, 2)):  # síndrome = '10'
-            circuit.x(q_data[2])
+        # 4. Corrección condicional (control dinámico): una sola tabla de saltos
+        if dynamic:
+            with circuit.switch(c_syndrome) as case:
+                with case(1):  # síndrome = '01'
+                    circuit.x(q_data[0])
+                with case(3):  # síndrome = '11'
+                    circuit.x(q_data[1])
+                with case(2):  # síndrome = '10'
+                    circuit.x(q_data[2])
+                with case(case.DEFAULT):  # síndrome = '00': sin corrección
+                    pass
             
         # 5. Medición final para verificación
         circuit.measure(q_data, c_final)
         
         return circuit
         
+    def get_compiled_circuit(self, initial_state: str = 'plus',
+                             error_qubit: Optional[int] = None,
+                             dynamic: bool = False) -> QuantumCircuit:
+        """Retorna el circuito QEC transpilado, construyéndolo una sola vez por escenario"""
+        key = (initial_state, error_qubit, dynamic)
+        if key not in self._compiled_circuits:
+            circuit = self.create_full_qec_circuit(initial_state, error_qubit=error_qubit,
+                                                   dynamic=dynamic)
+            self._compiled_circuits[key] = self._compile(circuit)
+        return self._compiled_circuits[key]
+        
+    def _compile(self, circuit: QuantumCircuit) -> QuantumCircuit:
+        """Prepara el circuito para el backend configurado (no-op si ya fue compilado)"""
+        metadata = circuit.metadata or {}
+        if metadata.get('compiled'):
+            return circuit
+        # Se transpila siempre, también para Aer: no reduce por sí mismo las puertas
+        # compuestas (enc3, syn3). Sin optimización: los pases de nivel 1+ están
+        # pensados para hardware real. El resultado queda en caché por escenario.
+        compiled = transpile(circuit, self.simulator, optimization_level=0)
+        compiled.metadata = {**metadata, 'compiled': True}
+        return compiled
+        
     def run_experiment(self, circuit: QuantumCircuit, shots: int = 1024) -> Dict:
-        """Ejecuta el experimento y retorna los resultados"""
-        transpiled_circuit = transpile(circuit, self.simulator)
-        job = self.simulator.run(transpiled_circuit, shots=shots)
+        """Ejecuta el experimento y retorna los conteos (compila el circuito si hace falta)"""
+        job = self.simulator.run(self._compile(circuit), shots=shots)
         result = job.result()
         counts = result.get_counts()
         return counts
         
-    def calculate_logical_error_rate(self, results: Dict, expected_logical_state: str) -> float:
-        """Calcula la tasa de error lógico"""
+    def run_batch(self, circuits: List[QuantumCircuit], shots: int = 1024,
+                  memory: bool = False) -> Result:
+        """
+        Ejecuta varios circuitos en un único trabajo del simulador (compilando los
+        que no vengan de get_compiled_circuit).
+        
+        Retorna el Result completo: get_counts(i) y, con memory=True, get_memory(i)
+        dan los resultados del circuito i.
+        """
+        compiled = [self._compile(circuit) for circuit in circuits]
+        return self.simulator.run(compiled, shots=shots, memory=memory).result()
+        
+    def run_experiment_memory(self, circuit: QuantumCircuit, shots: int = 1024) -> np.ndarray:
+        """Ejecuta con memory=True y retorna el resultado de cada disparo como entero"""
+        result = self.simulator.run(self._compile(circuit), shots=shots, memory=True).result()
+        return self._parse_memory(result.get_memory())
+        
+    @staticmethod
+    def _parse_memory(memory: List[str]) -> np.ndarray:
+        """Convierte cadenas "ddd ss" de get_memory en enteros (ddd << 2) | ss, sin bucles"""
+        # Cada carácter de un arreglo 'U' ocupa un uint32 con su código Unicode
+        chars = np.array(memory, dtype='U').view(np.uint32).reshape(len(memory), -1)
+        bits = chars[:, chars[0] != ord(' ')] - ord('0')
+        weights = 1 << np.arange(bits.shape[1] - 1, -1, -1)
+        return (bits @ weights).astype(np.uint8)
+        
+    def _build_outcome_lut(self, apply_correction: bool) -> np.ndarray:
+        """Precalcula el estado lógico para cada resultado (data << n_syndrome) | syndrome"""
+        n_data = self.code.n_data
+        n_syndrome = len(self.code.get_stabilizers())
+        lut = np.empty(2 ** (n_data + n_syndrome), dtype=np.uint8)
+        for data in range(2 ** n_data):
+            for syndrome in range(2 ** n_syndrome):
+                corrected = data
+                # Corrección diferida: XOR del qubit indicado por el síndrome
+                if apply_correction:
+                    error_qubit = self.code.decode_syndrome(syndrome)
+                    if error_qubit >= 0:
+                        corrected ^= 1 << error_qubit
+                lut[(data << n_syndrome) | syndrome] = LOGICAL[corrected]
+        return lut
+        
+    def _build_outcome_table(self, apply_correction: bool) -> Dict[str, int]:
+        """Precalcula el estado lógico para cada clave posible de get_counts"""
+        n_data = self.code.n_data
+        n_syndrome = len(self.code.get_stabilizers())
+        lut = self._outcome_luts[apply_correction]
+        return {f'{outcome >> n_syndrome:0{n_data}b} '
+                f'{outcome & ((1 << n_syndrome) - 1):0{n_syndrome}b}': int(lut[outcome])
+                for outcome in range(lut.size)}
+        
+    def calculate_logical_error_rate(self, results: Dict, expected_logical_state: str, *,
+                                     apply_correction: bool) -> float:
+        """
+        Calcula la tasa de error lógico.
+        
+        Con apply_correction=True (circuito estático) la corrección se aplica aquí:
+        se invierte el bit de datos que indica el síndrome antes de clasificar.
+        Usar apply_correction=False con circuitos dinámicos, ya corregidos. El valor
+        correcto es siempre not circuit.metadata['dynamic'].
+        """
+        # Una sola consulta por resultado: "data_bits syndrome_bits" -> bit lógico
+        outcome_table = self._outcome_tables[apply_correction]
+        expected = int(expected_logical_state)
         total_shots = sum(results.values())
-        error_shots = 0
+        # Resultados desconocidos (None) cuentan como error
+        error_shots = sum(count for outcome, count in results.items()
+                          if outcome_table.get(outcome) != expected)
         
-        for outcome, count in results.items():
-            # Extraer los bits de datos finales (últimos 3 bits)
-            data_bits = outcome.split()[-1]  # Formato: "syndrome_bits data_bits"
-            
-            # Determinar el estado lógico medido
-            if data_bits in ['000', '001', '010', '100']:
-                measured_logical = '0'
-            elif data_bits in ['111', '110', '101', '011']:
-                measured_logical = '1'
-            else:
-                # Estado mixto - contar como error
-                error_shots += count
-                continue
-                
-            if measured_logical != expected_logical_state:
-                error_shots += count
-                
         return error_shots / total_shots if total_shots > 0 else 0
         
+    def calculate_logical_error_rate_from_memory(self, outcomes: np.ndarray,
+                                                 expected_logical_state: str, *,
+                                                 apply_correction: bool) -> float:
+        """Tasa de error lógico vectorizada sobre los resultados por disparo (run_experiment_memory)"""
+        if outcomes.size == 0:
+            return 0
+        logical = self._outcome_luts[apply_correction][outcomes]
+        return float(np.mean(logical != int(expected_logical_state)))
+        
     def benchmark_performance(self, shots: int = 1000) -> Dict:
         """Benchmark del rendimiento del código QEC"""
         results = {}
         
-        # Test sin errores
-        circuit_no_error = self.create_full_qec_circuit('plus', error_qubit=None)
-        counts_no_error = self.run_experiment(circuit_no_error, shots)
-        results['no_error'] = {
-            'counts': counts_no_error,
-            'error_rate': self.calculate_logical_error_rate(counts_no_error, '0')
-        }
+        # Sin errores y con error en cada qubit, enviados en un solo trabajo. Se parte
+        # de |0⟩ para que el estado lógico esperado ('0') sea determinista.
+        scenarios = [('no_error', None)] + [(f'error_qubit_{i}', i) for i in range(3)]
+        circuits = [self.get_compiled_circuit('zero', error_qubit=error_qubit)
+                    for _, error_qubit in scenarios]
+        result = self.run_batch(circuits, shots, memory=True)
         
-        # Test con errores en cada qubit
-        for i in range(3):
-            circuit_error = self.create_full_qec_circuit('plus', error_qubit=i)
-            counts_error = self.run_experiment(circuit_error, shots)
-            results[f'error_qubit_{i}'] = {
-                'counts': counts_error,
-                'error_rate': self.calculate_logical_error_rate(counts_error, '0')
+        for i, (scenario, _) in enumerate(scenarios):
+            outcomes = self._parse_memory(result.get_memory(i))
+            results[scenario] = {
+                'counts': result.get_counts(i),
+                'error_rate': self.calculate_logical_error_rate_from_memory(
+                    outcomes, '0', apply_correction=True)
             }
             
         return results
+        
+    def benchmark_sweep(self, error_probs: List[float], shots: int = 1000) -> np.ndarray:
+        """
+        Tasa de error lógico para cada probabilidad de bit flip en error_probs.
+        
+        Todos los circuitos se envían en un solo trabajo y los resultados por disparo
+        se vuelcan en un arreglo preasignado (n_probs, shots) que se reduce de una vez.
+        """
+        circuits = [self.create_full_qec_circuit('zero', error_prob=p) for p in error_probs]
+        result = self.run_batch(circuits, shots, memory=True)
+        
+        outcomes = np.empty((len(circuits), shots), dtype=np.uint8)
+        for i in range(len(circuits)):
+            outcomes[i] = self._parse_memory(result.get_memory(i))
+            
+        # Estado inicial |0⟩: cualquier resultado lógico 1 es un error
+        return (self._outcome_luts[True][outcomes] != 0).mean(axis=1)
 
 def main():
     """Función principal para demostrar el sistema QEC"""
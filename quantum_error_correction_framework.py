@@ -269,12 +269,19 @@ class QuantumErrorCorrectionSimulator:
         results = {
             'times': [],
             'fidelities': [],
-            'logical_error_prob': [],
-            'correction_events': []
+            'logical_error_prob': []
         }
         
         current_time = t_span[0]
-        dt = (t_span[1] - t_span[0]) / 1000  # Paso temporal
+        n_steps = 1000
+        dt = (t_span[1] - t_span[0]) / n_steps  # Paso temporal
+        
+        # Eventos de corrección como arreglos paralelos preasignados (a lo sumo un
+        # evento por paso; +1 por el redondeo acumulado de current_time)
+        max_events = n_steps + 1
+        event_times = np.empty(max_events, dtype=np.float64)
+        event_success = np.empty(max_events, dtype=bool)
+        n_events = 0
         
         # Referencia para fidelidad
         target_rho = np.outer(encoded_state, encoded_state.conj())
@@ -287,10 +294,9 @@ class QuantumErrorCorrectionSimulator:
             if any(abs(current_time - t_corr) < dt/2 for t_corr in correction_intervals):
                 if self.correction_active:
                     rho, correction_success = self._perform_error_correction(rho)
-                    results['correction_events'].append({
-                        'time': current_time,
-                        'success': correction_success
-                    })
+                    event_times[n_events] = current_time
+                    event_success[n_events] = correction_success
+                    n_events += 1
             
             # Calcular métricas
             fidelity = np.real(np.trace(target_rho @ rho))
@@ -302,6 +308,10 @@ class QuantumErrorCorrectionSimulator:
             
             current_time += dt
             
+        results['correction_events'] = {
+            'time': event_times[:n_events],
+            'success': event_success[:n_events]
+        }
         return results
         
     def _lindblad_step(self, rho: np.ndarray, L_ops: List[np.ndarray], dt: float) -> np.ndarray:
@@ -525,7 +535,7 @@ def main_example():
     # 6. Análisis de resultados
     print(f"Fidelidad inicial: {results['fidelities'][0]:.4f}")
     print(f"Fidelidad final: {results['fidelities'][-1]:.4f}")
-    print(f"Eventos de corrección: {len(results['correction_events'])}")
+    print(f"Eventos de corrección: {len(results['correction_events']['time'])}")
     
     # 7. Optimización
     optimizer = ProtocolOptimizer(simulator)
@@ -0,0 +1,18 @@
+import pytest
+
+pytest.importorskip("catalyst")
+
+from qec_catalyst import benchmark_performance, calculate_logical_error_rate, run_cycles, to_counts
+
+
+@pytest.mark.parametrize("error_qubit", [None, 0, 1, 2])
+def test_single_bit_flip_is_corrected(error_qubit):
+    data = run_cycles('one', error_qubit, shots=64)
+
+    assert to_counts(data) == {'111': 64}
+    assert calculate_logical_error_rate(data, '1') == 0.0
+
+
+def test_benchmark_performance_corrects_single_flips():
+    for data in benchmark_performance(shots=64).values():
+        assert data['error_rate'] == 0.0
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("qiskit_aer")
+
+from qec_complete_system import QECSimulator, ThreeQubitCode
+
+
+@pytest.fixture(scope="module")
+def simulator():
+    return QECSimulator(ThreeQubitCode())
+
+
+def test_benchmark_performance_runs(simulator):
+    results = simulator.benchmark_performance(shots=64)
+
+    assert set(results) == {'no_error', 'error_qubit_0', 'error_qubit_1', 'error_qubit_2'}
+    for data in results.values():
+        assert sum(data['counts'].values()) == 64
+        assert data['error_rate'] == 0.0
+
+
+@pytest.mark.parametrize("dynamic", [False, True])
+@pytest.mark.parametrize("error_qubit", [None, 0, 1, 2])
+def test_single_bit_flip_is_corrected(simulator, dynamic, error_qubit):
+    circuit = simulator.get_compiled_circuit('one', error_qubit=error_qubit, dynamic=dynamic)
+    counts = simulator.run_experiment(circuit, shots=64)
+
+    apply_correction = not circuit.metadata['dynamic']
+    assert simulator.calculate_logical_error_rate(counts, '1', apply_correction=apply_correction) == 0.0
+
+
+def test_run_experiment_compiles_raw_circuits(simulator):
+    circuit = simulator.create_full_qec_circuit('one', error_qubit=0)
+    counts = simulator.run_experiment(circuit, shots=16)
+
+    assert simulator.calculate_logical_error_rate(counts, '1', apply_correction=True) == 0.0
+
+
+@pytest.mark.parametrize("syndrome, qubit", [(0, -1), (1, 0), (3, 1), (2, 2), (4, -1), (-1, -1)])
+def test_decode_syndrome(syndrome, qubit):
+    assert ThreeQubitCode().decode_syndrome(syndrome) == qubit
+
+
+def test_decode_batch_matches_decode_syndrome():
+    code = ThreeQubitCode()
+    syndromes = np.array([0, 1, 2, 3, 3, 0])
+
+    assert code.decode_batch(syndromes).tolist() == [code.decode_syndrome(s) for s in syndromes]
+
+
+def test_benchmark_sweep_matches_majority_vote(simulator):
+    p = 0.2
+    rates = simulator.benchmark_sweep([0.0, p, 1.0], shots=4000)
+
+    assert rates[0] == 0.0
+    assert rates[2] == 1.0
+    # Falla lógica = al menos 2 de 3 bit flips independientes
+    assert rates[1] == pytest.approx(3 * p**2 - 2 * p**3, abs=0.03)
+
+
+def test_run_experiment_memory_matches_counts(simulator):
+    circuit = simulator.get_compiled_circuit('one', error_qubit=2)
+    outcomes = simulator.run_experiment_memory(circuit, shots=32)
+
+    # Datos '011' (error en el qubit 2) con síndrome '10' -> (0b011 << 2) | 0b10
+    assert outcomes.tolist() == [0b01110] * 32
+    assert simulator.calculate_logical_error_rate_from_memory(
+        outcomes, '1', apply_correction=True) == 0.0